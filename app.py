@@ -2,13 +2,12 @@
 Flight Roster to Calendar Converter - Streamlit App
 """
 import streamlit as st
+import hashlib
+from bisect import bisect_left
 from datetime import datetime
-from zoneinfo import ZoneInfo
 
-# Import our custom modules
-from src.processors.pdf_processor import PDFProcessor
-from src.processors.roster_parser import RosterParser
-from src.generators.calendar_generator import CalendarGenerator
+# Import our custom modules (PDF and calendar modules are imported on first use,
+# so the upload form renders without loading the PDF/ICS libraries)
 from src.utils.exceptions import (
     FlightRosterError, 
     PDFProcessingError, 
@@ -23,35 +22,155 @@ st.set_page_config(
     layout="wide"
 )
 
+# Static sidebar content as (header, markdown) pairs, built once at import
+SIDEBAR_SECTIONS = (
+    ("⚠️ Disclaimer", """
+The owner of this application is not responsible for any errors, inaccuracies, 
+or misinterpretations in the outputs provided. Users are solely responsible for 
+verifying and cross-checking all outputs against their original inputs 
+before relying on or acting upon them.
+"""),
+    ("ℹ️ About", """
+This tool extracts flight information from LOT Polish Airlines roster PDFs and converts them to a standard calendar format.
 
-def process_roster_pdf(pdf_file, cutoff_datetime=None):
+**Supported format:**
+- LOT roster PDFs with C/I and C/O markers
+- Flight numbers starting with 'LO'
+- Standard airport codes
+"""),
+    ("🔧 Technical Info", """
+**File Limits:**
+- Maximum file size: 50MB
+- Supported format: PDF only
+- Text-based PDFs (not scanned images)
+
+**Flight Times:**
+- Roster times are read as UTC
+- A landing time at or before the departure time is treated as an overnight flight landing on the next day
+"""),
+    ("📋 Instructions", """
+1. Upload your roster PDF file
+2. Set the cutoff date (flights before this date will be excluded)
+3. Click 'Process PDF' to extract flights
+4. Download the generated calendar file
+5. Import the .ics file to your calendar app (Google Calendar, Outlook, etc.)
+"""),
+    ("🤝 Help Us Improve", """
+If you have any feedback or feature requests about the app, you can share them via [email](mailto:hawkuu9@gmail.com)
+
+If you found this app useful, please consider supporting [people](https://www.siepomaga.pl/) or [animals](https://www.ratujemyzwierzaki.pl/) in need.
+"""),
+)
+
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=32)
+def parse_pdf_bytes(pdf_bytes):
+    """
+    Extract, validate and parse roster PDF content
+    
+    Cached in memory on the PDF bytes, so reruns and re-uploads of the same
+    roster skip parsing. Rosters are personal schedule data, so entries are
+    never written to disk, expire after an hour and are capped in number.
+    
+    Args:
+        pdf_bytes: Raw PDF file content
+        
+    Returns:
+        Tuple of (number of extracted lines, list of FlightEvent objects)
+    """
+    from src.processors.pdf_processor import PDFProcessor
+    from src.processors.roster_parser import RosterParser
+    
+    lines = PDFProcessor.extract_text_from_pdf(pdf_bytes)
+    PDFProcessor.validate_pdf_structure(lines)
+    events = RosterParser.parse_flights_from_pdf_lines(lines)
+    return len(lines), events
+
+
+def events_fingerprint(events):
+    """
+    Compute a stable fingerprint of flight events for calendar caching
+    
+    Args:
+        events: List of FlightEvent objects
+        
+    Returns:
+        Hex digest identifying the events and their roster period
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if events:
+        digest.update(f"{events[0].period_start:%Y%m%d}-{events[0].period_end:%Y%m%d}".encode())
+    for event in events:
+        digest.update(
+            f"|LO{event.flight_no} {event.departure_airport}-{event.destination_airport} "
+            f"{event.departure_datetime.isoformat()} {event.arrival_datetime.isoformat()}".encode()
+        )
+    return digest.hexdigest()
+
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=16)
+def build_calendar_package(fingerprint, _events):
+    """
+    Create ICS calendar content and filename, cached on the events fingerprint
+    
+    Only the latest package of a session is offered for download, so the cache
+    keeps a few recent ones instead of one per roster and cutoff ever seen.
+    
+    Args:
+        fingerprint: Result of events_fingerprint for the events, used as cache key
+        _events: List of FlightEvent objects (pre-filtered), not hashed by Streamlit
+        
+    Returns:
+        Tuple of (ics_content, filename)
+    """
+    from src.generators.calendar_generator import CalendarGenerator
+    
+    return CalendarGenerator.create_calendar_package(_events)
+
+
+def filter_events_by_cutoff(events, cutoff_date):
+    """
+    Keep only flights departing on or after the cutoff date
+    
+    Events come out of the parser in roster (chronological) order, so the
+    first flight to keep is found by bisection instead of scanning every event.
+    
+    Args:
+        events: List of FlightEvent objects in chronological order
+        cutoff_date: Only include flights from this date onwards (optional)
+        
+    Returns:
+        List of FlightEvent objects departing on or after the cutoff date
+    """
+    if cutoff_date is None:
+        return events
+    
+    start = bisect_left(events, cutoff_date, key=lambda event: event.departure_datetime.date())
+    return events[start:]
+
+
+def process_roster_pdf(pdf_bytes, cutoff_date=None):
     """
     Process uploaded roster PDF and extract flight events
     
     Args:
-        pdf_file: Streamlit uploaded file object
-        cutoff_datetime: Only include flights after this datetime (optional)
+        pdf_bytes: Raw content of the uploaded PDF file
+        cutoff_date: Only include flights from this date onwards (optional)
         
     Returns:
         List of FlightEvent objects or empty list on error
     """
     try:
-        # Extract text from PDF
-        st.write("🔍 Extracting text from PDF...")
-        lines = PDFProcessor.extract_text_from_pdf(pdf_file)
-        st.write(f"✅ Extracted {len(lines)} lines from PDF")
-        
-        # Validate PDF structure
-        st.write("🔍 Validating PDF structure...")
-        PDFProcessor.validate_pdf_structure(lines)
+        # Extract, validate and parse PDF (cached per file content)
+        st.write("🔍 Parsing flights from PDF...")
+        # Runs on the script thread, the caller's "Processing PDF..." spinner shows progress
+        line_count, events = parse_pdf_bytes(pdf_bytes)
+        st.write(f"✅ Extracted {line_count} lines from PDF")
         st.write("✅ PDF structure validation passed")
         
-        # Parse flights from PDF lines (with cutoff filtering)
-        st.write("🔍 Parsing flights from PDF...")
-        events = RosterParser.parse_flights_from_pdf_lines(lines)
-        events = [event for event in events if (event.departure_datetime.date() >= cutoff_datetime.date()) 
-                    & (event.departure_datetime is not None)]
-        st.write(f"✅ Found {len(events)} flight events after {cutoff_datetime.date()}")
+        # Apply cutoff filtering
+        events = filter_events_by_cutoff(events, cutoff_date)
+        st.write(f"✅ Found {len(events)} flight events after {cutoff_date}")
         
         # Show some debug info
         if events:
@@ -84,7 +203,7 @@ def create_calendar_file(events):
         Tuple of (ics_content, filename) or (None, None) on error
     """
     try:
-        return CalendarGenerator.create_calendar_package(events)
+        return build_calendar_package(events_fingerprint(events), events)
     except CalendarGenerationError as e:
         st.error(f"Calendar Generation Error: {e}")
         return None, None
@@ -98,63 +217,25 @@ def display_flight_summary(events):
     if not events:
         return
     
-    flight_data = []
-    for event in events:
-        flight_data.append({
-            "Date": f"{event.departure_datetime.strftime('%Y-%m-%d')}",
-            "Flight": f"LO{event.flight_no}",
-            "Route": f"{event.departure_airport} → {event.destination_airport}",
-            "Departure": f"{event.departure_time[:2]}:{event.departure_time[2:]}",
-            "Arrival": f"{event.arrival_time[:2]}:{event.arrival_time[2:]}"
-        })
+    import pyarrow as pa  # Imported on first use, only needed once flights are shown
+    
+    # Build an Arrow table column by column, Streamlit serializes it without pandas inference
+    flight_data = pa.table({
+        "Date": [event.departure_date for event in events],
+        "Flight": [f"LO{event.flight_no}" for event in events],
+        "Route": [f"{event.departure_airport} → {event.destination_airport}" for event in events],
+        "Departure": [event.departure_hhmm for event in events],
+        "Arrival": [event.arrival_hhmm for event in events],
+    })
     
     st.dataframe(flight_data, use_container_width=True)
 
 
 def render_sidebar():
     """Render sidebar with instructions and information"""
-    st.sidebar.header("⚠️ Disclaimer")
-    st.sidebar.markdown("""
-                        The owner of this application is not responsible for any errors, inaccuracies, 
-                        or misinterpretations in the outputs provided. Users are solely responsible for 
-                        verifying and cross-checking all outputs against their original inputs 
-                        before relying on or acting upon them.
-                        """)
-    
-    st.sidebar.header("ℹ️ About")
-    st.sidebar.markdown("""
-    This tool extracts flight information from LOT Polish Airlines roster PDFs and converts them to a standard calendar format.
-    
-    **Supported format:**
-    - LOT roster PDFs with C/I and C/O markers
-    - Flight numbers starting with 'LO'
-    - Standard airport codes
-    """)
-    # TODO add technical limitations, like for example not handling "overnight" flights, 
-    # but could be added when presented with exemplar files
-    st.sidebar.header("🔧 Technical Info")
-    st.sidebar.markdown("""
-    **File Limits:**
-    - Maximum file size: 50MB
-    - Supported format: PDF only
-    - Text-based PDFs (not scanned images)
-    """)
-
-    st.sidebar.header("📋 Instructions")
-    st.sidebar.markdown("""
-    1. Upload your roster PDF file
-    2. Set the cutoff date (flights before this date will be excluded)
-    3. Click 'Process PDF' to extract flights
-    4. Download the generated calendar file
-    5. Import the .ics file to your calendar app (Google Calendar, Outlook, etc.)
-    """)
-
-    st.sidebar.header("🤝 Help Us Improve")
-    st.sidebar.markdown("""
-                        If you have any feedback or feature requests about the app, you can share them via [email](mailto:hawkuu9@gmail.com)
-                        
-                        If you found this app useful, please consider supporting [people](https://www.siepomaga.pl/) or [animals](https://www.ratujemyzwierzaki.pl/) in need.
-                        """)
+    for header, content in SIDEBAR_SECTIONS:
+        st.sidebar.header(header)
+        st.sidebar.markdown(content)
 
 
 def main():
@@ -167,6 +248,10 @@ def main():
         st.session_state.events = []
     if 'processed_file_name' not in st.session_state:
         st.session_state.processed_file_name = None
+    if 'last_cutoff' not in st.session_state:
+        st.session_state.last_cutoff = None
+    if 'last_ics' not in st.session_state:
+        st.session_state.last_ics = (None, None)
     
     # Render sidebar
     render_sidebar()
@@ -188,12 +273,6 @@ def main():
             min_value=datetime.today(),
             help="Flights before this date will be excluded from the calendar",
         )
-        if cutoff_date:
-            # Convert date to datetime with timezone
-            cutoff_datetime = datetime.combine(cutoff_date, datetime.min.time())
-            cutoff_datetime = cutoff_datetime.replace(tzinfo=ZoneInfo("Europe/Warsaw"))
-        else:
-            cutoff_datetime = None
     
     with col2:
         st.header("Status")
@@ -208,12 +287,15 @@ def main():
         if st.button("🚀 Process PDF", type="primary"):
             with st.spinner("Processing PDF..."):
                 # Extract events with cutoff filtering
-                events = process_roster_pdf(uploaded_file, cutoff_datetime)
+                # Read the upload once and pass the same bytes down the pipeline
+                events = process_roster_pdf(uploaded_file.getvalue(), cutoff_date)
 
                 if events:
                     # Store in session state
                     st.session_state.events = events
                     st.session_state.processed_file_name = uploaded_file.name
+                    st.session_state.last_ics = (None, None)
+                    st.session_state.just_processed = True
                     
                     st.success(f"✅ Found {len(events)} flights after {cutoff_date}")
                     
@@ -224,6 +306,8 @@ def main():
                     # Generate and offer calendar download
                     with st.spinner("Generating calendar file..."):
                         ics_content, filename = create_calendar_file(events)
+                        st.session_state.last_ics = (ics_content, filename)
+                        st.session_state.last_cutoff = cutoff_date
                         
                         if ics_content and filename:
                             st.success("✅ Calendar file generated successfully!")
@@ -251,35 +335,37 @@ def main():
         with status_placeholder.container():
             st.info("👆 Please upload a PDF file to get started")
     
-    # Display cached results if available
-    if st.session_state.events and st.session_state.processed_file_name:
+    # Display cached results if available, unless they were just rendered above
+    if (
+        st.session_state.events
+        and st.session_state.processed_file_name
+        and not st.session_state.pop('just_processed', False)
+    ):
         st.header("📅 Previously Processed Flights")
         st.caption(f"From file: {st.session_state.processed_file_name}")
         
         # Re-filter cached events based on current cutoff
-        filtered_events = []
-        for event in st.session_state.events:
-            departure_dt = event.departure_datetime
-            if (cutoff_datetime is not None) and (departure_dt.date() >= cutoff_datetime.date()):
-                filtered_events.append(event)
-            else:
-                filtered_events = st.session_state.events
+        filtered_events = filter_events_by_cutoff(st.session_state.events, cutoff_date)
         
         if filtered_events:
             display_flight_summary(filtered_events)
             
+            # Regenerate calendar only when the cutoff changed since the last rerun
+            if st.session_state.last_ics == (None, None) or cutoff_date != st.session_state.last_cutoff:
+                with st.spinner("Regenerating calendar file..."):
+                    st.session_state.last_ics = create_calendar_file(filtered_events)
+                    st.session_state.last_cutoff = cutoff_date
+            
             # Offer re-download with current cutoff
-            with st.spinner("Regenerating calendar file..."):
-                ics_content, filename = create_calendar_file(filtered_events)
-                
-                if ics_content and filename:
-                    st.download_button(
-                        label="📥 Re-download Calendar (.ics)",
-                        data=ics_content,
-                        file_name=filename,
-                        mime="text/calendar",
-                        key="redownload"
-                    )
+            ics_content, filename = st.session_state.last_ics
+            if ics_content and filename:
+                st.download_button(
+                    label="📥 Re-download Calendar (.ics)",
+                    data=ics_content,
+                    file_name=filename,
+                    mime="text/calendar",
+                    key="redownload"
+                )
         else:
             st.info(f"No cached flights found after {cutoff_date}. Process a new PDF or adjust the cutoff date.")
 
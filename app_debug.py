@@ -4,35 +4,45 @@ This version shows detailed debugging information to help identify parsing issue
 """
 import streamlit as st
 import re
-import pdfplumber
+import difflib
+from itertools import islice
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import tempfile
-import os
+
+from src.processors.pdf_processor import PDFProcessor, DEFAULT_BACKEND
+from src.utils.exceptions import FlightRosterError
 
 st.set_page_config(page_title="Debug Flight Roster Parser", page_icon="🐛", layout="wide")
 
+# Regex patterns compiled once at import, \d and \s limited to ASCII (rosters are plain ASCII)
+WORKDAY_PATTERN = re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sC/I\s([A-Za-z]{3})", re.ASCII)
+FLIGHT_PATTERN = re.compile(r"^LO (\d{1,5})", re.ASCII)
+FULL_FLIGHT_PATTERN = re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})\s([A-Za-z]{3})\s(\d{4})\s(\d{4})\s([A-Za-z]{3})", re.ASCII)
+
 def extract_and_debug_pdf(pdf_file):
     """Extract text from PDF and show debugging information"""
-    lines = []
-    
-    # Save uploaded file to temporary location
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        tmp_file.write(pdf_file.getvalue())
-        tmp_path = tmp_file.name
-    
+    # Same extraction and backend as app.py, so the debugger shows the lines the app parses
     try:
-        with pdfplumber.open(tmp_path) as pdf:
-            st.write(f"📄 **PDF Info:** {len(pdf.pages)} pages")
-            
-            for page_num, page in enumerate(pdf.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    page_lines = page_text.split("\n")
-                    lines.extend(page_lines)
-                    st.write(f"Page {page_num + 1}: {len(page_lines)} lines extracted")
-    finally:
-        os.unlink(tmp_path)
+        lines = PDFProcessor.extract_text_from_pdf(pdf_file)
+    except FlightRosterError as e:
+        st.error(f"❌ PDF extraction error: {e}")
+        return []
+    st.write(f"📄 **PDF Info:** {len(lines)} lines extracted with the `{DEFAULT_BACKEND}` backend")
+    
+    if DEFAULT_BACKEND == "pymupdf":
+        # PyMuPDF lines are rebuilt from words by PDFProcessor._group_words_into_lines,
+        # check them against pdfplumber's lines, which the roster patterns were written for
+        try:
+            reference_lines = PDFProcessor.extract_text_from_pdf(pdf_file, backend="pdfplumber")
+        except FlightRosterError as e:
+            st.warning(f"⚠️ Could not compare with pdfplumber: {e}")
+        else:
+            if reference_lines == lines:
+                st.success("✅ PyMuPDF lines match pdfplumber output")
+            else:
+                diff = list(difflib.unified_diff(reference_lines, lines, "pdfplumber", "pymupdf", lineterm=""))
+                st.warning("⚠️ PyMuPDF lines differ from pdfplumber output")
+                st.code("\n".join(diff))
     
     return lines
 
@@ -43,8 +53,7 @@ def debug_parsing_steps(lines):
     
     # Show first 10 lines
     st.subheader("1. First 10 lines from PDF:")
-    for i, line in enumerate(lines[:10]):
-        st.code(f"Line {i}: '{line}'")
+    st.code("\n".join(f"Line {i}: '{line}'" for i, line in enumerate(lines[:10])))
     
     # Test period parsing
     st.subheader("2. Period Parsing:")
@@ -69,9 +78,9 @@ def debug_parsing_steps(lines):
     st.subheader("3. Regex Pattern Testing:")
     
     patterns = {
-        "Workday Pattern": re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sC/I\s([A-Za-z]{3})"),
-        "Flight Pattern": re.compile(r"^LO (\d{1,5})"),
-        "Full Flight Pattern": re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})\s([A-Za-z]{3})\s(\d{4})\s(\d{4})\s([A-Za-z]{3})")
+        "Workday Pattern": WORKDAY_PATTERN,
+        "Flight Pattern": FLIGHT_PATTERN,
+        "Full Flight Pattern": FULL_FLIGHT_PATTERN
     }
     
     for pattern_name, pattern in patterns.items():
@@ -83,8 +92,8 @@ def debug_parsing_steps(lines):
         
         if matches:
             st.success(f"✅ Found {len(matches)} matches")
-            for line_num, line in matches[:5]:  # Show first 5 matches
-                st.code(f"Line {line_num}: '{line}'")
+            # Show first 5 matches
+            st.code("\n".join(f"Line {line_num}: '{line}'" for line_num, line in matches[:5]))
             if len(matches) > 5:
                 st.write(f"... and {len(matches) - 5} more")
         else:
@@ -98,23 +107,22 @@ def debug_parsing_steps(lines):
     collecting = False
     current_day = None
     current_weekday = None
+    # Messages are collected and shown in one block, not one Streamlit element per line
+    log = []
     
-    workday_pattern = re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sC/I\s([A-Za-z]{3})")
-    flight_pattern = re.compile(r"^LO (\d{1,5})")
-    
-    for i, line in enumerate(lines[3:], start=3):
+    for i, line in enumerate(islice(lines, 3, None), start=3):
         # Check for workday start
-        workday_match = workday_pattern.match(line)
+        workday_match = WORKDAY_PATTERN.match(line)
         if workday_match:
             current_day = workday_match.group(1)
             current_weekday = workday_match.group(2)
-            st.write(f"📅 Found workday: {current_day}. {current_weekday} (line {i})")
+            log.append(f"📅 Found workday: {current_day}. {current_weekday} (line {i})")
         
         # Start collecting when we see C/I
         if "C/I" in line:
             collecting = True
             current_section.append(line)
-            st.write(f"🟢 Start collecting: '{line}' (line {i})")
+            log.append(f"🟢 Start collecting: '{line}' (line {i})")
             continue
         
         # Stop collecting and save section when we see C/O
@@ -122,44 +130,44 @@ def debug_parsing_steps(lines):
             current_section.append(line)
             collecting = False
             sections.append(current_section)
-            st.write(f"🔴 Stop collecting: '{line}' (line {i}) - Section has {len(current_section)} lines")
+            log.append(f"🔴 Stop collecting: '{line}' (line {i}) - Section has {len(current_section)} lines")
             current_section = []
             continue
         
         # Add flight lines to current section
         if collecting and current_day and current_weekday:
-            flight_match = flight_pattern.match(line)
+            flight_match = FLIGHT_PATTERN.match(line)
             if flight_match:
                 modified_line = f"{current_day}. {current_weekday} {line}"
                 current_section.append(modified_line)
-                st.write(f"✈️ Added flight: '{modified_line}' (line {i})")
+                log.append(f"✈️ Added flight: '{modified_line}' (line {i})")
             else:
                 current_section.append(line)
-                st.write(f"📝 Added other: '{line}' (line {i})")
+                log.append(f"📝 Added other: '{line}' (line {i})")
     
+    if log:
+        st.code("\n".join(log))
     st.write(f"**Total sections found: {len(sections)}**")
     
     # Test flight extraction from sections
     st.subheader("5. Flight Extraction from Sections:")
     
-    full_flight_pattern = re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})\s([A-Za-z]{3})\s(\d{4})\s(\d{4})\s([A-Za-z]{3})")
-    
     all_flights = []
     for section_num, section in enumerate(sections):
         st.write(f"**Section {section_num + 1}:** {len(section)} lines")
         section_flights = []
         
         for entry in section:
-            if full_flight_pattern.match(entry):
+            if FULL_FLIGHT_PATTERN.match(entry):
                 section_flights.append(entry)
                 all_flights.append(entry)
-                st.code(f"✈️ Flight: {entry}")
         
-        if not section_flights:
+        if section_flights:
+            st.code("\n".join(f"✈️ Flight: {entry}" for entry in section_flights))
+        else:
             st.write("❌ No flights found in this section")
             st.write("Section contents:")
-            for entry in section:
-                st.code(f"  '{entry}'")
+            st.code("\n".join(f"  '{entry}'" for entry in section))
     
     st.write(f"**Total flights found: {len(all_flights)}**")
     
@@ -181,8 +189,7 @@ def main():
         
         if st.checkbox("Show all extracted lines", help="Warning: This might be very long!"):
             st.subheader("All extracted lines:")
-            for i, line in enumerate(lines):
-                st.code(f"{i:3d}: '{line}'")
+            st.code("\n".join(f"{i:3d}: '{line}'" for i, line in enumerate(lines)))
         
         # Run debugging
         flights = debug_parsing_steps(lines)
@@ -191,8 +198,7 @@ def main():
             st.success(f"🎉 Successfully found {len(flights)} flights!")
             
             st.subheader("✈️ Found Flights:")
-            for flight in flights:
-                st.code(flight)
+            st.code("\n".join(flights))
         else:
             st.error("❌ No flights found - check the debug information above")
             
@@ -1,126 +1,206 @@
 # streamlit_app.py
 import re
-import pdfplumber
-from ics import Calendar, Event
-from datetime import datetime
+import sys
+from bisect import bisect_right
+from itertools import islice
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import streamlit as st
 from io import BytesIO
-import pandas as pd
+from src.generators.calendar_generator import fold_ics_line
+from src.processors.roster_parser import parse_period_date
+
+# pdfplumber and pandas are imported where they are used, so reruns before an upload stay cheap
+
+UTC = ZoneInfo("UTC")
+WARSAW_TZ = ZoneInfo("Europe/Warsaw")
+
+# Regex patterns compiled once at import, \d and \s limited to ASCII (rosters are plain ASCII)
+WORKDAY_PATTERN = re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sC/I\s([A-Za-z]{3})", re.ASCII)
+FLIGHT_PATTERN = re.compile(r"^LO (\d{1,5})", re.ASCII)
+FULL_FLIGHT_PATTERN = re.compile(
+    r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})\s([A-Za-z]{3})\s(\d{4})\s(\d{4})\s([A-Za-z]{3})",
+    re.ASCII,
+)
+ICS_DATETIME_FORMAT = "%Y%m%dT%H%M%SZ"  # UTC date-time, no VTIMEZONE needed
 
 # ------------------------------
 # Your existing functions
 # ------------------------------
-def extract_events_from_pdf(pdf_file):
-    lines = []
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            for line in page.extract_text().split("\n"):
-                lines.append(line)
-
-    period_start = datetime.strptime(lines[1].split(" ")[1], "%d%b%y")
-    period_end = datetime.strptime(lines[1].split(" ")[2], "%d%b%y")
+def extract_page_lines(pages):
+    # Lines come straight from the char stream, no page-wide join and split
+    return [
+        text_line["text"]
+        for page in pages
+        for text_line in page.extract_text_lines(return_chars=False)
+    ]
+
+
+def extract_lines_from_pdf(pdf_bytes):
+    import pdfplumber
+
+    # Pages are read in this process: worker processes would re-run this script's
+    # top-level UI when spawned, and forking Streamlit's threaded server is unsafe
+    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        return extract_page_lines(pdf.pages)
+
+
+# Cached on the PDF bytes, so widget reruns (e.g. changing the cutoff date) skip parsing
+@st.cache_data(show_spinner=False)
+def extract_events_from_pdf(pdf_bytes):
+    lines = extract_lines_from_pdf(pdf_bytes)
+
+    period_parts = lines[1].split(" ", 3)  # Only the two dates are needed, the rest stays unsplit
+    period_start = parse_period_date(period_parts[1])
+    period_end = parse_period_date(period_parts[2])
+
+    # Flights are stored column-wise, one list per field
+    events = {
+        "period_start": [],
+        "period_end": [],
+        "flight_day_of_month": [],
+        "flight_day_of_week": [],
+        "flight_no": [],
+        "departure_airport": [],
+        "planned_departure_time": [],
+        "planned_landing_time": [],
+        "destination_airport": [],
+    }
+    columns = list(events.values())
+    (period_start_col, period_end_col, day_col, weekday_col, flight_no_col,
+     departure_airport_col, departure_time_col, landing_time_col, destination_airport_col) = columns
 
     collect = False
-    section = []
-    sections = []
-    for line in lines[3:]:
-        match_workday_start_date = re.match(
-            r"^(\d{1,2})\.\s([A-Za-z]{3})\sC/I\s([A-Za-z]{3})", line
-        )
-        if match_workday_start_date:
-            day = match_workday_start_date.group(1)
-            weekday = match_workday_start_date.group(2)
-
-        match_flight = re.match(r"^LO (\d{1,5})", line)
-        if "C/I" in line:
+    kept_rows = 0  # flights up to the last C/O line, later rows belong to an unfinished work day
+    for line in islice(lines, 3, None):  # Skip the header without copying the list
+        # Substring checks first, regexes only run on candidate lines
+        has_check_in = "C/I" in line
+        if has_check_in:
+            match_workday_start_date = WORKDAY_PATTERN.match(line)
+            if match_workday_start_date:
+                day = match_workday_start_date.group(1)
+                weekday = match_workday_start_date.group(2)
+
+        match_flight = line.startswith("LO ") and FLIGHT_PATTERN.match(line)
+        has_check_out = False
+        if has_check_in:
             collect = True
-            section.append(line)
-            continue
-        if "C/O" in line:
-            section.append(line)
+            entry = line
+        elif "C/O" in line:
             collect = False
-            sections.append(section)
-            section = []
-        if collect and match_flight:
-            section.append(f"{day}. {weekday} " + line)
-        if collect and not match_flight:
-            section.append(line)
-
-    flights = []
-    for section in sections:
-        for entry in section:
-            match_flight = re.match(
-                r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})", entry
-            )
-            if match_flight:
-                flights.append(entry)
-
-    events = []
-    for flight in flights:
-        match_flight = re.match(
-            r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})\s([A-Za-z]{3})\s(\d{4})\s(\d{4})\s([A-Za-z]{3})",
-            flight,
-        )
-        if match_flight:
-            event = {
-                "period_start": period_start,
-                "period_end": period_end,
-                "flight_day_of_month": int(match_flight.group(1)),
-                "flight_day_of_week": match_flight.group(2),
-                "flight_no": match_flight.group(3),
-                "departure_airport": match_flight.group(4),
-                "planned_departure_time": match_flight.group(5),
-                "planned_landing_time": match_flight.group(6),
-                "destination_airport": match_flight.group(7),
-            }
-            events.append(event)
+            has_check_out = True
+            entry = line
+        elif collect and match_flight:
+            entry = f"{day}. {weekday} {line}"
+        elif collect:
+            entry = line
+        else:
+            continue
+
+        # Each section entry is matched once and turned into an event right away
+        match_full_flight = FULL_FLIGHT_PATTERN.match(entry)
+        if match_full_flight:
+            (flight_day, flight_weekday, flight_no, departure_airport,
+             departure_time, landing_time, destination_airport) = match_full_flight.groups()
+            period_start_col.append(period_start)
+            period_end_col.append(period_end)
+            day_col.append(int(flight_day))
+            # Weekdays and airport codes repeat across a roster, so rows share one string each
+            weekday_col.append(sys.intern(flight_weekday))
+            flight_no_col.append(flight_no)
+            departure_airport_col.append(sys.intern(departure_airport))
+            departure_time_col.append(departure_time)
+            landing_time_col.append(landing_time)
+            destination_airport_col.append(sys.intern(destination_airport))
+        if has_check_out:
+            kept_rows = len(day_col)
+
+    for column in columns:
+        del column[kept_rows:]
     return events
 
 
 def create_ics_file(cutoff_date, events):
-    calendar = Calendar()
-    prev_event_data = None
-    start_or_end = "period_start"
-
-    for event_data in events:
-        event = Event()
-        event.name = f"LO{event_data['flight_no']} z {event_data['departure_airport']} do {event_data['destination_airport']}"
-        event.description = fr"""Tabela lotów: https://www.flightradar24.com/data/flights/LO{event_data["flight_no"]}"""
-
-        if (prev_event_data is not None) and (
-            prev_event_data["flight_day_of_month"] > event_data["flight_day_of_month"]
-        ):
-            start_or_end = "period_end"
+    # Calendar is written as a list of content lines joined once at the end
+    dtstamp = datetime.now(UTC).strftime(ICS_DATETIME_FORMAT)
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//flights-schedule-app//app_gpt//EN"]
+    # Year and month of every flight, computed up front: once the day of month goes back,
+    # the roster has wrapped into the month of the period end
+    period_months = []
+    prev_day = 0
+    use_period_end = False
+    for period_start, period_end, day in zip(
+        events["period_start"], events["period_end"], events["flight_day_of_month"]
+    ):
+        if day < prev_day:
+            use_period_end = True
+        prev_day = day
+        period_date = period_end if use_period_end else period_start
+        period_months.append((period_date.year, period_date.month))
+
+    def begin_datetime(index):
+        year, month = period_months[index]
+        departure_hour, departure_minute = divmod(int(events["planned_departure_time"][index]), 100)
+        return datetime(
+            year,
+            month,
+            events["flight_day_of_month"][index],
+            departure_hour,
+            departure_minute,
+            tzinfo=UTC,
+        )
 
+    # Flights are in roster (chronological) order, so the first flight after the cutoff is
+    # found by bisection and earlier flights never get their datetimes or VEVENT built.
+    # Aware datetimes compare across time zones, so no conversion to Warsaw time is needed
+    first = bisect_right(range(len(period_months)), cutoff_date, key=begin_datetime)
+
+    for (year, month), day, flight_no, departure_airport, departure_time, landing_time, destination_airport in zip(
+        period_months[first:],
+        events["flight_day_of_month"][first:],
+        events["flight_no"][first:],
+        events["departure_airport"][first:],
+        events["planned_departure_time"][first:],
+        events["planned_landing_time"][first:],
+        events["destination_airport"][first:],
+    ):
+        departure_hour, departure_minute = divmod(int(departure_time), 100)
         datetime_for_event_begin = datetime(
-            event_data[start_or_end].year,
-            event_data[start_or_end].month,
-            event_data["flight_day_of_month"],
-            int(event_data["planned_departure_time"][:2]),
-            int(event_data["planned_departure_time"][2:]),
-            tzinfo=ZoneInfo("UTC"),
+            year,
+            month,
+            day,
+            departure_hour,
+            departure_minute,
+            tzinfo=UTC,
         )
-        dt_warsaw_begin = datetime_for_event_begin.astimezone(ZoneInfo("Europe/Warsaw"))
 
+        landing_hour, landing_minute = divmod(int(landing_time), 100)
         datetime_for_event_end = datetime(
-            event_data[start_or_end].year,
-            event_data[start_or_end].month,
-            event_data["flight_day_of_month"],
-            int(event_data["planned_landing_time"][:2]),
-            int(event_data["planned_landing_time"][2:]),
-            tzinfo=ZoneInfo("UTC"),
+            year,
+            month,
+            day,
+            landing_hour,
+            landing_minute,
+            tzinfo=UTC,
         )
-        dt_warsaw_end = datetime_for_event_end.astimezone(ZoneInfo("Europe/Warsaw"))
-
-        if dt_warsaw_begin > cutoff_date:
-            event.begin = dt_warsaw_begin
-            event.end = dt_warsaw_end
-            calendar.events.add(event)
-
-        prev_event_data = event_data
-
-    return str(calendar)
+        if landing_time <= departure_time:
+            # Overnight flight: the roster only lists the landing time, which is on the next UTC day
+            datetime_for_event_end += timedelta(days=1)
+
+        dtstart = datetime_for_event_begin.strftime(ICS_DATETIME_FORMAT)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:LO{flight_no}-{dtstart}@flights-schedule-app",
+            f"DTSTAMP:{dtstamp}",
+            f"DTSTART:{dtstart}",
+            f"DTEND:{datetime_for_event_end.strftime(ICS_DATETIME_FORMAT)}",
+            f"SUMMARY:LO{flight_no} z {departure_airport} do {destination_airport}",
+            f"DESCRIPTION:Tabela lotów: https://www.flightradar24.com/data/flights/LO{flight_no}",
+            "END:VEVENT",
+        ]
+
+    lines.append("END:VCALENDAR")
+    return "".join([f"{fold_ics_line(line)}\r\n" for line in lines])
 
 
 # ------------------------------
@@ -132,27 +212,33 @@ uploaded_file = st.file_uploader("Upload your roster PDF", type=["pdf"])
 cutoff_date = st.date_input("Cutoff date", value=datetime.today().date())
 
 if uploaded_file is not None:
-    events = extract_events_from_pdf(uploaded_file)
+    events = extract_events_from_pdf(uploaded_file.getvalue())
+    flight_count = len(events["flight_no"])
 
-    if len(events) == 0:
+    if flight_count == 0:
         st.warning("No flights detected in this PDF. Check format or parsing rules.")
     else:
-        st.success(f"Found {len(events)} flights in the PDF ✅")
+        st.success(f"Found {flight_count} flights in the PDF ✅")
+
+        import pandas as pd
 
         # Preview extracted flights as table
-        df = pd.DataFrame(events)
-        df["planned_departure_time"] = df["planned_departure_time"].apply(lambda x: f"{x[:2]}:{x[2:]}")
-        df["planned_landing_time"] = df["planned_landing_time"].apply(lambda x: f"{x[:2]}:{x[2:]}")
+        # Columns are passed straight through, only the times are reformatted
+        df = pd.DataFrame({
+            "flight_day_of_month": events["flight_day_of_month"],
+            "flight_day_of_week": events["flight_day_of_week"],
+            "flight_no": events["flight_no"],
+            "departure_airport": events["departure_airport"],
+            "planned_departure_time": [f"{t[:2]}:{t[2:]}" for t in events["planned_departure_time"]],
+            "planned_landing_time": [f"{t[:2]}:{t[2:]}" for t in events["planned_landing_time"]],
+            "destination_airport": events["destination_airport"],
+        })
         st.subheader("Preview of extracted flights:")
-        st.dataframe(df[[
-            "flight_day_of_month", "flight_day_of_week", "flight_no",
-            "departure_airport", "planned_departure_time",
-            "planned_landing_time", "destination_airport"
-        ]])
+        st.dataframe(df)
 
         if st.button("Generate Calendar"):
             ics_content = create_ics_file(
-                datetime.combine(cutoff_date, datetime.min.time(), tzinfo=ZoneInfo("Europe/Warsaw")),
+                datetime.combine(cutoff_date, datetime.min.time(), tzinfo=WARSAW_TZ),
                 events
             )
             ics_bytes = BytesIO(ics_content.encode("utf-8"))
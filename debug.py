@@ -2,7 +2,6 @@
 # %%
 import re
 import pdfplumber  # For extracting tables from PDF
-from ics import Calendar, Event  # For creating .ics files
 from datetime import datetime
 from zoneinfo import ZoneInfo
 # zczytanie tekstu z pdfa i podział na linie
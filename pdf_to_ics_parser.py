@@ -1,28 +1,50 @@
 # %%
 import re
+import sys
+from bisect import bisect_right
+from itertools import islice
 import pdfplumber  # For extracting tables from PDF
-from ics import Calendar, Event  # For creating .ics files
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
+from src.generators.calendar_generator import fold_ics_line
+# data okresu rozpiski (np. 17Aug25) parsowana wspólną funkcją z src, bez strptime
+from src.processors.roster_parser import parse_period_date
+
+# strefa czasowa tworzona raz, a nie dla każdego lotu
+UTC = ZoneInfo("UTC")
+# format daty w pliku .ics - czas UTC, więc nie trzeba dodawać VTIMEZONE
+ICS_DATETIME_FORMAT = "%Y%m%dT%H%M%SZ"
+
+# wyrażenia regularne kompilowane raz, przy imporcie modułu (opis wzorców w extract_events_from_pdf)
+# re.ASCII: \d i \s dopasowują tylko znaki ASCII, rozpiska i tak jest w ASCII
+WORKDAY_PATTERN = re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sC/I\s([A-Za-z]{3})", re.ASCII)
+FLIGHT_PATTERN = re.compile(r"^LO (\d{1,5})", re.ASCII)
+FULL_FLIGHT_PATTERN = re.compile(
+    r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})\s([A-Za-z]{3})\s(\d{4})\s(\d{4})\s([A-Za-z]{3})",
+    re.ASCII,
+)
 
 
 # %%
 def extract_events_from_pdf(pdf_path):
-    # zczytanie tekstu z pdfa i podział na linie
+    # zczytanie tekstu z pdfa od razu jako linie (bez sklejania strony w jeden tekst i dzielenia po \n)
     lines = []
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
-            for line in page.extract_text().split("\n"):
-                lines.append(line)
+            lines.extend(text_line["text"] for text_line in page.extract_text_lines(return_chars=False))
     # zczytanie z drugiej linijki na jaki okres jest rozpiska z pdfa
-    period_start = datetime.strptime(lines[1].split(" ")[1], "%d%b%y")
-    period_end = datetime.strptime(lines[1].split(" ")[2], "%d%b%y")
+    # potrzebne są tylko dwie daty, reszta linii nie jest dzielona
+    period_parts = lines[1].split(" ", 3)
+    period_start = parse_period_date(period_parts[1])
+    period_end = parse_period_date(period_parts[2])
 
-    # podział na dni pracy
+    # podział na dni pracy i rozpoznawanie lotów w jednym przejściu po liniach
+    # loty z dnia pracy trafiają do events dopiero po linii z C/O
     collect = False
     section = []
-    sections = []
-    for line in lines[3:]:
+    events = []
+    # islice pomija nagłówek bez kopiowania listy linii
+    for line in islice(lines, 3, None):
         # początek dnia pracy jest rozpoznawany poprzez:
         # - ^ sprawdzenie od początku linijki,
         # - sprawdzenie czy w linijce jest dzień miesiąca: (\d{1,2}) - sprawdza czy liczba jest maksymalnie dwucyfrowa,
@@ -32,118 +54,128 @@ def extract_events_from_pdf(pdf_path):
         # - C/I clock-in/check-in
         # - sprawdzenie lotniska na którym jest check-in ([A-Za-z]{3})
         # ogólnie powyższą walidacje można by poprawić, ale jest dobrym punktem startowym
-        match_workday_start_date = re.match(
-            r"^(\d{1,2})\.\s([A-Za-z]{3})\sC/I\s([A-Za-z]{3})", line
-        )
+        # tani test na podciąg przed regexem, większość linii nie zawiera C/I
+        has_check_in = "C/I" in line
         # "zwykłe nawiasy": () definiują grupe w regexach, zapisanie dnia miesiąca i tygodnia z grupy 1 i 2
-        if match_workday_start_date:
+        if has_check_in and (match_workday_start_date := WORKDAY_PATTERN.match(line)):
             day = match_workday_start_date.group(1)
             weekday = match_workday_start_date.group(2)
         # jeśli linia zaczyna się od LO i nr lotu, to będziemy musieli dodać dzień miesiąca i dzień tygodnia zapisany w powyższych dwóch linijkach
         # nazwa zmiennej jest myląca, ale nieważne
-        match_flight = re.match(r"^LO (\d{1,5})", line)
-        if "C/I" in line:
+        match_flight = line.startswith("LO ") and FLIGHT_PATTERN.match(line)
+        end_of_section = False
+        if has_check_in:
             collect = True
-            section.append(line)
-            continue
-        if "C/O" in line:
-            section.append(line)
+            entry = line
+        elif "C/O" in line:
             collect = False
-            sections.append(section)
-            section = []
+            end_of_section = True
+            entry = line
         # dodawanie tego typu linii: 'LO 635 WAW 2055 2300 SOF E75'
-        if collect and match_flight:
-            section.append(f"{day}. {weekday} " + line)
+        elif collect and match_flight:
+            entry = f"{day}. {weekday} {line}"
         # dodawanie tego typu linii: '29. Thu LO 636 SOF 0220 0425 WAW E75'
-        if collect and not match_flight:
-            section.append(line)
-
-    # faktycznie rozpoznawanie lotów
-    # odrzucanie np takich linijek: 'H1 SOF'
-    flights = []
-    # sprawdzamy "dni robocze"
-    for section in sections:
-        # sprawdzamy czy dany element dnia jest lotem
-        for entry in section:
-            match_flight = re.match(
-                r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})", entry
-            )
-            if match_flight:
-                flights.append(entry)
+        elif collect:
+            entry = line
+        else:
+            continue
 
-    # zapisanie istotnych informacji na temat lotów do słowników
-    events = []
-    for flight in flights:
-        # ostateczne sprawdzenie czy lot jest lotem xd i zapisanie informacji z każdej z "grup" do słownika
-        match_flight = re.match(
-            r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})\s([A-Za-z]{3})\s(\d{4})\s(\d{4})\s([A-Za-z]{3})",
-            flight,
-        )
-        if match_flight:
-            event = {
+        # faktycznie rozpoznawanie lotów, jedno dopasowanie na linię
+        # odrzucanie np takich linijek: 'H1 SOF'
+        # zapisanie istotnych informacji na temat lotu z każdej z "grup" do słownika
+        # dni tygodnia i kody lotnisk się powtarzają, sys.intern sprawia że loty współdzielą jeden obiekt str
+        match_full_flight = FULL_FLIGHT_PATTERN.match(entry)
+        if match_full_flight:
+            # jedno wywołanie groups() zamiast osobnego group() dla każdego pola
+            (flight_day, flight_weekday, flight_no, departure_airport,
+             departure_time, landing_time, destination_airport) = match_full_flight.groups()
+            section.append({
                 "period_start": period_start,
                 "period_end": period_end,
-                "flight_day_of_month": int(match_flight.group(1)),
-                "flight_day_of_week": match_flight.group(2),
-                "flight_no": match_flight.group(3),
-                "departure_airport": match_flight.group(4),
-                "planned_departure_time": match_flight.group(5),
-                "planned_landing_time": match_flight.group(6),
-                "destination_airport": match_flight.group(7),
-            }
-            events.append(event)
+                "flight_day_of_month": int(flight_day),
+                "flight_day_of_week": sys.intern(flight_weekday),
+                "flight_no": flight_no,
+                "departure_airport": sys.intern(departure_airport),
+                "planned_departure_time": departure_time,
+                "planned_landing_time": landing_time,
+                "destination_airport": sys.intern(destination_airport),
+            })
+        if end_of_section:
+            events.extend(section)
+            section = []
     return events
 
 
 def create_ics_file(cutoff_date, events, output_path):
-    calendar = Calendar()
-    prev_event_data = None
+    # plik .ics budowany jako lista linii i sklejany raz na końcu (zamiast biblioteki ics)
+    dtstamp = datetime.now(UTC).strftime(ICS_DATETIME_FORMAT)
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//flights-schedule-app//pdf_to_ics_parser//EN"]
+    # rok i miesiąc każdego lotu wyliczane z góry, przed główną pętlą
+    # sprawdzenie czy poprzedni lot miał "wyższy" dzień niż obecny, wtedy należy wziąć miesiąc i rok z końca okresu
+    # (to już jest datetime, więc bez .date())
+    period_months = []
+    prev_day = 0
     start_or_end = "period_start"
     for event_data in events:
-        # TODO add handling overnight fligts
-        # print(event_data)
-        event = Event()
-        event.name = f"LO{event_data['flight_no']} z {event_data['departure_airport']} do {event_data['destination_airport']}"
-        event.description = rf"""Tabela lotów: https://www.flightradar24.com/data/flights/LO{event_data["flight_no"]}
-"""
-        # sprawdzenie czy poprzedni lot miał "wyższy" dzień niż obecny, wtedy należy wziąć miesiąc i rok z końca okresu
-        # znów nazwa zmiennej nie jest idealna, ale z grubsza mówi ocb
-        if (prev_event_data is not None) and (
-            prev_event_data["flight_day_of_month"] > event_data["flight_day_of_month"]
-        ):
+        if event_data["flight_day_of_month"] < prev_day:
             start_or_end = "period_end"
+        prev_day = event_data["flight_day_of_month"]
+        period_date = event_data[start_or_end]
+        period_months.append((period_date.year, period_date.month))
+
+    def begin_datetime(index):
+        year, month = period_months[index]
+        departure_hour, departure_minute = divmod(int(events[index]["planned_departure_time"]), 100)
+        return datetime(year, month, events[index]["flight_day_of_month"], departure_hour, departure_minute, tzinfo=UTC)
+
+    # loty są w kolejności z rozpiski (chronologicznie), więc pierwszy lot po cutoff_date
+    # jest wyszukiwany binarnie, a dla wcześniejszych lotów nie są tworzone datetime
+    # bez konwersji na czas warszawski: do pliku idzie UTC, a datetime ze strefą
+    # porównuje się poprawnie z cutoff_date niezależnie od jego strefy
+    first = bisect_right(range(len(events)), cutoff_date, key=begin_datetime)
+
+    for event_data, (year, month) in zip(islice(events, first, None), islice(period_months, first, None)):
+        # print(event_data)
+        day = event_data["flight_day_of_month"]
+        # godziny w formacie HHMM, jedna konwersja int i divmod zamiast dwóch wycinków
+        departure_hour, departure_minute = divmod(int(event_data["planned_departure_time"]), 100)
+        landing_hour, landing_minute = divmod(int(event_data["planned_landing_time"]), 100)
         # zapisanie datetime początku eventu
         datetime_for_event_begin = datetime(
-            event_data[start_or_end].date().year,
-            event_data[start_or_end].date().month,
-            event_data["flight_day_of_month"],
-            int(event_data["planned_departure_time"][:2]),
-            int(event_data["planned_departure_time"][2:]),
-            tzinfo=ZoneInfo("UTC"),
+            year,
+            month,
+            day,
+            departure_hour,
+            departure_minute,
+            tzinfo=UTC,
         )
-        # konwersja na odpowiednią strefę czasową (to właściwie nie jest konieczne,
-        # bo przynajmniej kalendarz Google dobrze to wyświetla niezależnie od strefy którą zapiszę do pliku)
-        dt_warsaw_begin = datetime_for_event_begin.astimezone(ZoneInfo("Europe/Warsaw"))
         datetime_for_event_end = datetime(
-            event_data[start_or_end].date().year,
-            event_data[start_or_end].date().month,
-            event_data["flight_day_of_month"],
-            int(event_data["planned_landing_time"][:2]),
-            int(event_data["planned_landing_time"][2:]),
-            tzinfo=ZoneInfo("UTC"),
+            year,
+            month,
+            day,
+            landing_hour,
+            landing_minute,
+            tzinfo=UTC,
         )
-        # konwersja na odpowiednią strefę czasową (to właściwie nie jest konieczne,
-        # bo przynajmniej kalendarz Google dobrze to wyświetla niezależnie od strefy którą zapiszę do pliku)
-        dt_warsaw_end = datetime_for_event_end.astimezone(ZoneInfo("Europe/Warsaw"))
-        if dt_warsaw_begin > cutoff_date:
-            event.begin = dt_warsaw_begin
-            event.end = dt_warsaw_end
-            calendar.events.add(event)
-        else:
-            pass
-        prev_event_data = event_data
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.writelines(calendar)
+        # lot przez północ (UTC): w rozpisce jest tylko godzina lądowania, które jest następnego dnia
+        if event_data["planned_landing_time"] <= event_data["planned_departure_time"]:
+            datetime_for_event_end += timedelta(days=1)
+        dtstart = datetime_for_event_begin.strftime(ICS_DATETIME_FORMAT)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:LO{event_data['flight_no']}-{dtstart}@flights-schedule-app",
+            f"DTSTAMP:{dtstamp}",
+            f"DTSTART:{dtstart}",
+            f"DTEND:{datetime_for_event_end.strftime(ICS_DATETIME_FORMAT)}",
+            f"SUMMARY:LO{event_data['flight_no']} z {event_data['departure_airport']} do {event_data['destination_airport']}",
+            # \\n to zapisany w pliku znak nowej linii na końcu opisu
+            f"DESCRIPTION:Tabela lotów: https://www.flightradar24.com/data/flights/LO{event_data['flight_no']}\\n",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    # newline="", żeby końce linii \r\n zostały zapisane bez zmian
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        f.write("".join([f"{fold_ics_line(line)}\r\n" for line in lines]))
 
 
 # %%
@@ -3,14 +3,51 @@ Calendar generation utilities
 """
 from datetime import datetime
 from typing import List
-from ics import Calendar, Event
-from ..models.flight_event import FlightEvent
+from ..models.flight_event import FlightEvent, UTC
 from ..utils.exceptions import CalendarGenerationError
 
+MAX_LINE_OCTETS = 75  # RFC 5545 content line limit, excluding CRLF
+
+
+def fold_ics_line(line: str) -> str:
+    """
+    Fold a content line longer than 75 octets (RFC 5545 3.1)
+    
+    Continuation lines start with a space, and UTF-8 characters
+    (such as the route arrow) are never split across lines.
+    
+    Args:
+        line: Unfolded content line
+        
+    Returns:
+        Content line, folded with CRLF + space where needed
+    """
+    if len(line.encode("utf-8")) <= MAX_LINE_OCTETS:
+        return line
+    
+    chunks = []
+    chunk_start = 0
+    size = 0
+    limit = MAX_LINE_OCTETS
+    for index, char in enumerate(line):
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > limit:
+            chunks.append(line[chunk_start:index])
+            chunk_start = index
+            size = 0
+            limit = MAX_LINE_OCTETS - 1  # Leading space counts towards the limit
+        size += char_size
+    chunks.append(line[chunk_start:])
+    return "\r\n ".join(chunks)
+
 
 class CalendarGenerator:
     """Generates ICS calendar files from flight events"""
     
+    PRODID = "-//flights-schedule-app//Flight Roster to Calendar//EN"
+    UID_DOMAIN = "flights-schedule-app"
+    DATETIME_FORMAT = "%Y%m%dT%H%M%SZ"  # UTC date-time, no VTIMEZONE needed
+    
     @staticmethod
     def create_ics_from_events(events: List[FlightEvent]) -> str:
         """
@@ -26,23 +63,62 @@ class CalendarGenerator:
             CalendarGenerationError: If calendar generation fails
         """
         try:
-            calendar = Calendar()
+            dtstamp = datetime.now(UTC).strftime(CalendarGenerator.DATETIME_FORMAT)
+            lines = [
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                f"PRODID:{CalendarGenerator.PRODID}",
+            ]
+            
+            # Look up helpers once, not per flight
+            format_datetime = CalendarGenerator._format_datetime
+            escape_text = CalendarGenerator._escape_text
+            create_description = CalendarGenerator._create_event_description
+            uid_domain = CalendarGenerator.UID_DOMAIN
             
-            for i, flight in enumerate(events):
-                
-                event = Event()
-                event.name = flight.display_name
-                event.description = CalendarGenerator._create_event_description(flight)
-                event.begin = flight.departure_datetime
-                event.end = flight.arrival_datetime
-                
-                calendar.events.add(event)
+            for flight in events:
+                dtstart = format_datetime(flight.departure_datetime)
+                dtend = format_datetime(flight.arrival_datetime)
+                # UTC date-time strings compare chronologically, also across a DST change
+                if dtend <= dtstart:
+                    raise CalendarGenerationError(
+                        f"End must be after begin for LO{flight.flight_no} departing {dtstart}"
+                    )
+                lines += [
+                    "BEGIN:VEVENT",
+                    # Stable UID, so re-importing an updated roster updates events instead of duplicating them
+                    f"UID:LO{flight.flight_no}-{dtstart}@{uid_domain}",
+                    f"DTSTAMP:{dtstamp}",
+                    f"DTSTART:{dtstart}",
+                    f"DTEND:{dtend}",
+                    f"SUMMARY:{escape_text(flight.display_name)}",
+                    f"DESCRIPTION:{escape_text(create_description(flight))}",
+                    "END:VEVENT",
+                ]
             
-            return calendar.serialize()
+            lines.append("END:VCALENDAR")
+            return "".join([f"{fold_ics_line(line)}\r\n" for line in lines])
         
+        except CalendarGenerationError:
+            raise
         except Exception as e:
             raise CalendarGenerationError(f"Error creating calendar file: {e}")
     
+    @staticmethod
+    def _format_datetime(value: datetime) -> str:
+        """Format an aware datetime as an ICS UTC date-time"""
+        return value.astimezone(UTC).strftime(CalendarGenerator.DATETIME_FORMAT)
+    
+    @staticmethod
+    def _escape_text(text: str) -> str:
+        """Escape an ICS TEXT value (RFC 5545 3.3.11)"""
+        return (
+            text.replace("\\", "\\\\")
+            .replace(";", "\\;")
+            .replace(",", "\\,")
+            .replace("\n", "\\n")
+        )
+    
     @staticmethod
     def _create_event_description(flight: FlightEvent) -> str:
         """
@@ -56,8 +132,8 @@ class CalendarGenerator:
         """
         return f"""Flight: LO{flight.flight_no}
 Route: {flight.departure_airport} → {flight.destination_airport}
-Departure: {flight.departure_time[:2]}:{flight.departure_time[2:]} UTC
-Arrival: {flight.arrival_time[:2]}:{flight.arrival_time[2:]} UTC
+Departure: {flight.departure_hhmm} UTC
+Arrival: {flight.arrival_hhmm} UTC
 Tracker: {flight.tracker_url}"""
     
     @staticmethod
@@ -2,11 +2,49 @@
 Flight event data model
 """
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
 from zoneinfo import ZoneInfo
 
+# Roster times are in UTC, calendar events are shown in Polish local time
+UTC = ZoneInfo("UTC")
+WARSAW_TZ = ZoneInfo("Europe/Warsaw")
 
-@dataclass
+
+def _warsaw_offset(utc_datetime: datetime) -> timedelta:
+    """Warsaw UTC offset at a naive UTC datetime"""
+    return utc_datetime.replace(tzinfo=UTC).astimezone(WARSAW_TZ).utcoffset()
+
+
+@lru_cache(maxsize=None)
+def _parse_hhmm(hhmm: str) -> Tuple[int, int, str]:
+    """
+    Parse a HHMM roster time, cached since a roster repeats the same few times
+    
+    Returns:
+        Tuple of (hour, minute, "HH:MM" display string)
+    """
+    hour, minute = divmod(int(hhmm), 100)
+    return hour, minute, f"{hhmm[:2]}:{hhmm[2:]}"
+
+
+@lru_cache(maxsize=None)
+def _warsaw_month_offset(year: int, month: int) -> Optional[timedelta]:
+    """
+    Warsaw UTC offset of a month, resolved once per month
+    
+    Returns:
+        The offset for the whole month, or None for a month with a DST change
+    """
+    month_start = datetime(year, month, 1)
+    next_month = datetime(year + month // 12, month % 12 + 1, 1)
+    offset = _warsaw_offset(month_start)
+    # Warsaw changes its offset at most once a month
+    return offset if _warsaw_offset(next_month - timedelta(hours=1)) == offset else None
+
+
+@dataclass(slots=True)
 class FlightEvent:
     """Represents a single flight event"""
     flight_no: str
@@ -21,29 +59,65 @@ class FlightEvent:
     departure_datetime: datetime = None
     arrival_datetime: datetime = None
 
+    def _local_datetime(self, base_date: datetime, hhmm: str) -> datetime:
+        """Build the Warsaw-local datetime of a HHMM UTC roster time on the flight day"""
+        hour, minute, _ = _parse_hhmm(hhmm)
+        year, month = base_date.year, base_date.month
+        offset = _warsaw_month_offset(year, month)
+        if offset is None:
+            # DST change in this month, zoneinfo resolves the offset and the repeated autumn hour
+            return datetime(year, month, self.day_of_month, hour, minute, tzinfo=UTC).astimezone(WARSAW_TZ)
+        # The UTC wall time is built with the Warsaw tzinfo and shifted by the month's offset,
+        # which is cheaper than astimezone() for every flight
+        return datetime(year, month, self.day_of_month, hour, minute, tzinfo=WARSAW_TZ) + offset
+
+    def _local_arrival_datetime(self, base_date: datetime) -> datetime:
+        """Build the Warsaw-local arrival datetime, on the next day for overnight flights"""
+        if self.arrival_time > self.departure_time:
+            return self._local_datetime(base_date, self.arrival_time)
+        # The roster only lists arrival times, so an arrival not after the departure
+        # lands on the next UTC day, which may be in the next month
+        hour, minute, _ = _parse_hhmm(self.arrival_time)
+        arrival = datetime(base_date.year, base_date.month, self.day_of_month, hour, minute, tzinfo=UTC)
+        return (arrival + timedelta(days=1)).astimezone(WARSAW_TZ)
+
     def set_departure_datetime(self, use_period_end: bool = False) -> datetime:
         """Set departure datetime with proper timezone"""
         base_date = self.period_end if use_period_end else self.period_start
-        self.departure_datetime = datetime(
-            base_date.year,
-            base_date.month,
-            self.day_of_month,
-            int(self.departure_time[:2]),
-            int(self.departure_time[2:]),
-            tzinfo=ZoneInfo("UTC")
-        ).astimezone(ZoneInfo("Europe/Warsaw"))
+        self.departure_datetime = self._local_datetime(base_date, self.departure_time)
+        return self.departure_datetime
         
     def set_arrival_datetime(self, use_period_end: bool = False) -> datetime:
         """Set arrival datetime with proper timezone"""
         base_date = self.period_end if use_period_end else self.period_start
-        self.arrival_datetime = datetime(
-            base_date.year,
-            base_date.month,
-            self.day_of_month,
-            int(self.arrival_time[:2]),
-            int(self.arrival_time[2:]),
-            tzinfo=ZoneInfo("UTC")
-        ).astimezone(ZoneInfo("Europe/Warsaw"))
+        self.arrival_datetime = self._local_arrival_datetime(base_date)
+        return self.arrival_datetime
+
+    def set_datetimes(self, use_period_end: bool = False) -> None:
+        """Set departure and arrival datetimes in one go, resolving the base month once"""
+        base_date = self.period_end if use_period_end else self.period_start
+        self.departure_datetime = self._local_datetime(base_date, self.departure_time)
+        self.arrival_datetime = self._local_arrival_datetime(base_date)
+    
+    # Display strings are derived on access, so they always match the fields,
+    # also after departure_datetime or arrival_datetime is assigned directly
+    @property
+    def departure_hhmm(self) -> str:
+        """Get departure time as HH:MM (UTC)"""
+        return _parse_hhmm(self.departure_time)[2]
+    
+    @property
+    def arrival_hhmm(self) -> str:
+        """Get arrival time as HH:MM (UTC)"""
+        return _parse_hhmm(self.arrival_time)[2]
+    
+    @property
+    def departure_date(self) -> Optional[str]:
+        """Get local departure date as YYYY-MM-DD, None before the datetimes are set"""
+        if self.departure_datetime is None:
+            return None
+        # date().isoformat() gives the same YYYY-MM-DD as strftime, without its tz lookups
+        return self.departure_datetime.date().isoformat()
     
     @property
     def display_name(self) -> str:
@@ -53,4 +127,4 @@ class FlightEvent:
     @property
     def tracker_url(self) -> str:
         """Get flight tracker URL"""
-        return f"https://www.flightradar24.com/data/flights/LO{self.flight_no}"
\ No newline at end of file
+        return f"https://www.flightradar24.com/data/flights/LO{self.flight_no}"
@@ -1,25 +1,36 @@
 """
 PDF processing utilities
 """
-import tempfile
-import os
-from typing import List
-import pdfplumber
+import io
+import logging
+from importlib.util import find_spec
+from typing import List, Optional
 from ..utils.exceptions import PDFProcessingError, FileSizeError, InvalidFileError
 
+logger = logging.getLogger(__name__)
+
+# PyMuPDF is optional, pdfplumber is used when it is not installed.
+# Both backends are imported on first use to keep module import cheap.
+HAS_PYMUPDF = find_spec("pymupdf") is not None
+DEFAULT_BACKEND = "pymupdf" if HAS_PYMUPDF else "pdfplumber"
+
 
 class PDFProcessor:
     """Handles PDF text extraction and validation"""
     
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    LINE_TOLERANCE = 3  # Max baseline distance (pt) for words on one line, same as pdfplumber
     
     @classmethod
-    def extract_text_from_pdf(cls, pdf_file) -> List[str]:
+    def extract_text_from_pdf(cls, pdf_file, backend: Optional[str] = None) -> List[str]:
         """
         Extract text lines from PDF file
+
+        Uses PyMuPDF when it is installed and pdfplumber otherwise.
         
         Args:
-            pdf_file: Streamlit uploaded file object
+            pdf_file: Streamlit uploaded file object or raw PDF bytes
+            backend: "pymupdf" or "pdfplumber" to force a backend (optional)
             
         Returns:
             List of text lines from the PDF
@@ -29,41 +40,133 @@ class PDFProcessor:
             InvalidFileError: If file is corrupted or empty
             PDFProcessingError: For other processing errors
         """
-        if pdf_file.size > cls.MAX_FILE_SIZE:
+        file_size = len(pdf_file) if isinstance(pdf_file, bytes) else pdf_file.size
+        if file_size > cls.MAX_FILE_SIZE:
             raise FileSizeError("File too large. Maximum size is 50MB.")
         
+        backend = backend or DEFAULT_BACKEND
+        if backend == "pymupdf" and not HAS_PYMUPDF:
+            raise PDFProcessingError("PyMuPDF backend requested but pymupdf is not installed.")
+        
+        # Only read the upload once its size is known to be acceptable. UploadedFile is a
+        # BytesIO over the uploaded bytes, so getvalue() shares them, while getbuffer()
+        # would force a full copy.
+        pdf_bytes = pdf_file if isinstance(pdf_file, bytes) else pdf_file.getvalue()
+        if backend == "pdfplumber":
+            lines = cls._extract_lines_pdfplumber(pdf_bytes)
+        elif backend == "pymupdf":
+            lines = cls._extract_lines_pymupdf(pdf_bytes)
+        else:
+            raise PDFProcessingError(f"Unknown PDF backend: {backend}")
+
+        if not lines:
+            raise InvalidFileError("No text could be extracted from the PDF.")
+
+        return lines
+
+    @classmethod
+    def _extract_lines_pymupdf(cls, pdf_bytes: bytes) -> List[str]:
+        """
+        Extract text lines from PDF file with PyMuPDF
+
+        MuPDF extracts a page in about a millisecond, so even large documents
+        are processed sequentially; worker processes would cost more to start.
+        """
+        import pymupdf
+        
+        try:
+            with pymupdf.open(stream=pdf_bytes, filetype="pdf") as pdf:
+                page_count = pdf.page_count
+                if not page_count:
+                    raise InvalidFileError("PDF file appears to be empty or corrupted.")
+
+                return cls._extract_pages_pymupdf(pdf, 0, page_count)
+
+        except Exception as e:
+            raise PDFProcessingError(f"Error reading PDF file: {e}")
+
+    @classmethod
+    def _extract_pages_pymupdf(cls, pdf, start: int, end: int) -> List[str]:
+        """Extract text lines from pages start..end-1 of an open PyMuPDF document"""
+        lines = []
+        for page_index in range(start, end):
+            try:
+                lines.extend(cls._group_words_into_lines(pdf[page_index].get_text("words")))
+            except Exception as e:
+                # Log warning but continue processing other pages
+                logger.warning("Could not extract text from page %d: %s", page_index + 1, e)
+                continue
+        return lines
+
+    @classmethod
+    def _group_words_into_lines(cls, words: List[tuple]) -> List[str]:
+        """
+        Join PyMuPDF words sharing a baseline into text lines
+
+        MuPDF reports table cells as separate lines, while the roster parser
+        expects one line per table row as produced by pdfplumber.
+
+        Args:
+            words: PyMuPDF word tuples (x0, y0, x1, y1, text, ...)
+
+        Returns:
+            List of text lines, top to bottom
+        """
         lines = []
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(pdf_file.getvalue())
-            tmp_path = tmp_file.name
+        row = []
+        baseline = None
+        for word in sorted(words, key=lambda w: w[3]):
+            if row and word[3] - baseline > cls.LINE_TOLERANCE:
+                lines.append(" ".join(w[4] for w in sorted(row)))
+                row = []
+            if not row:
+                baseline = word[3]
+            row.append(word)
+        if row:
+            lines.append(" ".join(w[4] for w in sorted(row)))
+        return lines
+
+    @classmethod
+    def _extract_lines_pdfplumber(cls, pdf_bytes: bytes) -> List[str]:
+        """
+        Extract text lines from PDF file with pdfplumber
+
+        Pages are extracted sequentially in the calling process. Worker
+        processes do not pay off under Streamlit: spawned workers re-import
+        the app script as their main module, and forking its multi-threaded
+        server is unsafe.
+        """
+        import pdfplumber
         
         try:
-            with pdfplumber.open(tmp_path) as pdf:
-                if not pdf.pages:
+            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+                page_count = len(pdf.pages)
+                if not page_count:
                     raise InvalidFileError("PDF file appears to be empty or corrupted.")
                 
-                for page_num, page in enumerate(pdf.pages, 1):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            lines.extend(page_text.split("\n"))
-                    except Exception as e:
-                        # Log warning but continue processing other pages
-                        print(f"Warning: Could not extract text from page {page_num}: {e}")
-                        continue
+                return cls._extract_pages_pdfplumber(pdf, 0, page_count)
                         
         except Exception as e:
             raise PDFProcessingError(f"Error reading PDF file: {e}")
-        finally:
-            # Clean up temporary file
+    
+    @classmethod
+    def _extract_pages_pdfplumber(cls, pdf, start: int, end: int) -> List[str]:
+        """Extract text lines from pages start..end-1 of an open pdfplumber document"""
+        lines = []
+        for page_index in range(start, end):
             try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass  # File might already be deleted
-        
-        if not lines:
-            raise InvalidFileError("No text could be extracted from the PDF.")
-        
+                page = pdf.pages[page_index]
+                # Image-only pages (e.g. a scanned cover) have no chars, skip text layout
+                page_text = page.extract_text() if page.chars else None
+                # pdf.pages keeps every page alive, so drop this page's cached layout
+                # objects now rather than holding the whole document until close
+                page.close()
+                if page_text:
+                    lines.extend(page_text.split("\n"))
+            except Exception as e:
+                # Log warning but continue processing other pages
+                logger.warning("Could not extract text from page %d: %s", page_index + 1, e)
+                continue
         return lines
     
     @staticmethod
@@ -82,4 +185,4 @@ class PDFProcessor:
         
         # Basic validation - could be extended
         if not any("C/I" in line or "C/O" in line for line in lines):
-            raise InvalidFileError("PDF doesn't appear to be a valid roster file. Missing C/I or C/O markers.")
\ No newline at end of file
+            raise InvalidFileError("PDF doesn't appear to be a valid roster file. Missing C/I or C/O markers.")
@@ -1,28 +1,61 @@
 """
 Roster parsing utilities
 """
+import logging
 import re
+import sys
 from datetime import datetime
-from zoneinfo import ZoneInfo
-from typing import List, Optional, Tuple
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
 from ..models.flight_event import FlightEvent
 from ..utils.exceptions import RosterParsingError
 
+logger = logging.getLogger(__name__)
+
+# Period dates such as 17Aug25 (ddMMMyy)
+PERIOD_DATE_PATTERN = re.compile(r"(\d{1,2})([A-Za-z]{3})(\d{2})", re.ASCII)
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1
+    )
+}
+
+
+def parse_period_date(value: str) -> datetime:
+    """
+    Parse a ddMMMyy period date such as 17Aug25
+    
+    Same result as datetime.strptime(value, "%d%b%y"), without strptime's
+    format parsing and its _strptime import on first use.
+    
+    Raises:
+        ValueError: If value is not a ddMMMyy date
+    """
+    match = PERIOD_DATE_PATTERN.fullmatch(value)
+    month = match and MONTHS.get(match.group(2).title())
+    if not month:
+        raise ValueError(f"time data {value!r} does not match format '%d%b%y'")
+    year = int(match.group(3))
+    # Two-digit years follow strptime's %y: 69-99 are 1900s, 00-68 are 2000s
+    return datetime(year + (1900 if year >= 69 else 2000), month, int(match.group(1)))
+
 
 class RosterParser:
     """Parses roster data from PDF text lines"""
     
-    # Regex patterns as class constants
-    WORKDAY_PATTERN = re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sC/I\s([A-Za-z]{3})")
-    FLIGHT_PATTERN = re.compile(r"^LO (\d{1,5})")
-    FULL_FLIGHT_PATTERN = re.compile(
-        r"^(\d{1,2})\.\s([A-Za-z]{3})\sLO\s(\d{1,5})\s([A-Za-z]{3})\s(\d{4})\s(\d{4})\s([A-Za-z]{3})"
-    )
+    # Regex patterns as class constants, ASCII-only since roster text is plain ASCII
+    WORKDAY_PATTERN = re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\sC/I\s([A-Za-z]{3})", re.ASCII)
+    # A full flight line is "<day>. <weekday> LO <no> <from> <dep> <arr> <to>"; flights
+    # continuing a work day lack the day prefix and are matched from "LO" directly
+    DAY_PREFIX_PATTERN = re.compile(r"^(\d{1,2})\.\s([A-Za-z]{3})\s", re.ASCII)
+    FLIGHT_DETAILS_PATTERN = re.compile(r"LO\s(\d{1,5})\s([A-Za-z]{3})\s(\d{4})\s(\d{4})\s([A-Za-z]{3})", re.ASCII)
     CUTOFF_DATETIME_PATTERN = re.compile(
-        r'\b(\d{1,2}[A-Za-z]{3}\d{2})\b'
+        r'\b(\d{1,2}[A-Za-z]{3}\d{2})\b',
+        re.ASCII,
     )
     @classmethod
-    def parse_period(cls, lines: List[str]) -> Tuple[datetime, datetime, datetime]:
+    def parse_period(cls, lines: List[str]) -> Tuple[datetime, datetime]:
         """
         Extract period dates from PDF header
         
@@ -39,93 +72,22 @@ class RosterParser:
             raise RosterParsingError("PDF doesn't contain enough data to parse period.")
         
         try:
-            period_parts = lines[1].split(" ")
+            period_parts = lines[1].split(" ", 3)  # Only the two dates are needed, the rest stays unsplit
             if len(period_parts) < 3:
                 raise RosterParsingError("Cannot parse period from PDF header. Expected format not found.")
             
-            period_start = datetime.strptime(period_parts[1], "%d%b%y")
-            period_end = datetime.strptime(period_parts[2], "%d%b%y")
+            period_start = parse_period_date(period_parts[1])
+            period_end = parse_period_date(period_parts[2])
             return period_start, period_end
         except (ValueError, IndexError) as e:
             raise RosterParsingError(f"Error parsing period dates: {e}")
     
     @classmethod
-    def extract_work_sections(cls, lines: List[str]) -> List[List[str]]:
-        """
-        Extract work day sections from PDF lines
-        
-        Args:
-            lines: List of text lines from PDF
-            
-        Returns:
-            List of work sections, each containing related work day lines
-        """
-        sections = []
-        current_section = []
-        collecting = False
-        current_day = None
-        current_weekday = None
-        # TODO add other entries than actual flights
-        for line in lines[3:]:  # Skip header lines
-            # Check for workday start
-            workday_match = cls.WORKDAY_PATTERN.match(line)
-            if workday_match:
-                current_day = workday_match.group(1)
-                current_weekday = workday_match.group(2)
-            
-            # Start collecting when we see C/I
-            if "C/I" in line:
-                collecting = True
-                current_section.append(line)
-                continue
-            
-            # Stop collecting and save section when we see C/O
-            if "C/O" in line:
-                current_section.append(line)
-                collecting = False
-                if current_section:
-                    sections.append(current_section)
-                current_section = []
-                continue
-            
-            # Add flight lines to current section
-            if collecting and current_day is not None and current_weekday is not None:
-                flight_match = cls.FLIGHT_PATTERN.match(line)
-                if flight_match:
-                    current_section.append(f"{current_day}. {current_weekday} {line}")
-                else:
-                    current_section.append(line)
-        
-        return sections
-    
-    @classmethod
-    def extract_flights_from_sections(cls, sections: List[List[str]]) -> List[str]:
-        """
-        Extract flight lines from work sections
-        
-        Args:
-            sections: List of work sections
-            
-        Returns:
-            List of flight line strings
-        """
-        flights = []
-        for section in sections:
-            for entry in section:
-                # Check if line contains a valid flight pattern
-                if "LO" in entry and cls._is_valid_flight_line(entry):
-                    flights.append(entry)
-        return flights
-    
-    @classmethod
-    def _is_valid_flight_line(cls, line: str) -> bool:
-        """Check if line contains a valid flight pattern"""
-        return bool(cls.FULL_FLIGHT_PATTERN.match(line))
-    
-    @classmethod
-    def parse_flight_to_event(
+    def _parse_flight_line(
         cls, 
-        flight_line: str, 
+        line: str, 
+        day: Optional[int], 
+        weekday: Optional[str], 
         period_start: datetime, 
         period_end: datetime
     ) -> Optional[FlightEvent]:
@@ -133,35 +95,119 @@ class RosterParser:
         Parse a flight line into a FlightEvent object
         
         Args:
-            flight_line: Raw flight line string
+            line: Full "<day>. <weekday> LO ..." line, or "LO ..." line when day is given
+            day: Day of month of the work day the line continues (optional)
+            weekday: Weekday of the work day the line continues (optional)
             period_start: Period start date
             period_end: Period end date
             
         Returns:
-            FlightEvent object or None if parsing fails
+            FlightEvent object or None if the line is not a flight
         """
-        match = cls.FULL_FLIGHT_PATTERN.match(flight_line)
+        start = 0
+        if day is None:
+            # Cheap checks first, most lines are not flights
+            if not line[:1].isdigit() or "LO" not in line:
+                return None
+            prefix_match = cls.DAY_PREFIX_PATTERN.match(line)
+            if not prefix_match:
+                return None
+            day, weekday, start = int(prefix_match.group(1)), prefix_match.group(2), prefix_match.end()
+        
+        match = cls.FLIGHT_DETAILS_PATTERN.match(line, start)
         if not match:
             return None
         
+        # One groups() call instead of a group() call per field
+        flight_no, departure_airport, departure_time, arrival_time, destination_airport = match.groups()
         try:
             return FlightEvent(
-                day_of_month=int(match.group(1)),
-                day_of_week=match.group(2),
-                flight_no=match.group(3),
-                departure_airport=match.group(4),
-                departure_time=match.group(5),
-                arrival_time=match.group(6),
-                destination_airport=match.group(7),
+                day_of_month=day,
+                # Weekdays and airport codes repeat across a roster, so flights share one string each
+                day_of_week=sys.intern(weekday),
+                flight_no=flight_no,
+                departure_airport=sys.intern(departure_airport),
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+                destination_airport=sys.intern(destination_airport),
                 period_start=period_start,
                 period_end=period_end
             )
         except (ValueError, TypeError) as e:
-            print(f"Warning: Could not parse flight line '{flight_line}': {e}")
+            logger.warning("Could not parse flight line '%s': %s", line, e)
             return None
     
     @classmethod
-    def parse_flights_from_pdf_lines(cls, lines: List[str]) -> Tuple[List[FlightEvent], datetime]:
+    def iter_flight_events(cls, lines: Iterable[str]) -> Iterator[FlightEvent]:
+        """
+        Lazily parse PDF lines into FlightEvent objects, in roster order
+        
+        Work day sections run from a C/I line to the next C/O line and are
+        parsed in a single pass; flights of a section are yielded once its
+        C/O line is reached.
+        
+        Args:
+            lines: Text lines from PDF, any iterable (consumed once, never copied)
+            
+        Yields:
+            FlightEvent objects with departure and arrival datetimes set
+            
+        Raises:
+            RosterParsingError: If period cannot be parsed
+        """
+        lines = iter(lines)
+        header = list(islice(lines, 3))  # Header lines, the period is on the second one
+        
+        # Parse period information
+        period_start, period_end = cls.parse_period(header)
+        
+        section_events = []
+        collecting = False
+        current_day = None
+        current_weekday = None
+        prev_day = 0
+        use_period_end = False
+        # TODO add other entries than actual flights
+        for line in lines:
+            # C/I starts collecting a section, C/O closes it. Substring checks dispatch
+            # lines about twice as fast as a single alternation regex with lastgroup
+            check_out = False
+            if "C/I" in line:
+                # Check for workday start, only C/I lines can start one
+                workday_match = cls.WORKDAY_PATTERN.match(line)
+                if workday_match:
+                    current_day = int(workday_match.group(1))
+                    current_weekday = workday_match.group(2)
+                collecting = True
+                event = cls._parse_flight_line(line, None, None, period_start, period_end)
+            elif "C/O" in line:
+                collecting = False
+                check_out = True
+                event = cls._parse_flight_line(line, None, None, period_start, period_end)
+            elif not collecting or current_day is None:
+                continue
+            elif line.startswith("LO "):
+                # Flight continuing the current work day
+                event = cls._parse_flight_line(line, current_day, current_weekday, period_start, period_end)
+            else:
+                event = cls._parse_flight_line(line, None, None, period_start, period_end)
+            
+            if event:
+                section_events.append(event)
+            
+            if check_out:
+                for event in section_events:
+                    # Days going backwards means the roster rolled over into the period end month.
+                    # A period rolls over at most once, so the check stops after the first rollover
+                    if not use_period_end:
+                        use_period_end = prev_day > event.day_of_month
+                        prev_day = event.day_of_month
+                    event.set_datetimes(use_period_end)
+                    yield event
+                section_events = []
+    
+    @classmethod
+    def parse_flights_from_pdf_lines(cls, lines: List[str]) -> List[FlightEvent]:
         """
         Complete parsing pipeline from PDF lines to FlightEvent objects
         
@@ -175,34 +221,9 @@ class RosterParser:
             RosterParsingError: If parsing fails
         """
         try:
-            # Parse period information
-            period_start, period_end = cls.parse_period(lines)
-            
-            # Extract work sections
-            sections = cls.extract_work_sections(lines)
-            
-            # Extract flight lines
-            flight_lines = cls.extract_flights_from_sections(sections)
-            
-            # Parse flights into events
-            events = []
-            prev_event = None
-            use_period_end = False
-            period_switched = False
-            for flight_line in flight_lines:
-                event = cls.parse_flight_to_event(flight_line, period_start, period_end)
-                if event:
-                    if not period_switched:
-                        if (prev_event is not None) and (prev_event.day_of_month > event.day_of_month):
-                            use_period_end = True
-                            period_switched = True
-                    event.set_departure_datetime(use_period_end)
-                    event.set_arrival_datetime(use_period_end)
-                    events.append(event)
-                    prev_event = event
-            return events
+            return list(cls.iter_flight_events(lines))
         
         except Exception as e:
             if isinstance(e, RosterParsingError):
                 raise
-            raise RosterParsingError(f"Unexpected error during parsing: {e}")
\ No newline at end of file
+            raise RosterParsingError(f"Unexpected error during parsing: {e}")